@@ -0,0 +1,118 @@
+# backend/bot_client.py
+import asyncio
+import importlib.util
+import os
+from typing import Optional, Protocol
+
+import httpx
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(__file__)
+ENV_PATH = os.path.join(BASE_DIR, ".env")
+load_dotenv(ENV_PATH)
+
+# "http" : bot dans un process séparé, "local" : bot dans la même boucle que FastAPI
+BOT_MODE = os.getenv("BOT_MODE", "http")
+BOT_MODES = ("http", "local")
+DISCORD_BOT_URL = os.getenv("DISCORD_BOT_URL", "http://localhost:8080")
+# Secret partagé avec l'API du bot (en-tête X-Bot-Token)
+BOT_API_TOKEN = os.getenv("BOT_API_TOKEN")
+# Salle de jeu du bot servie par ce backend
+GAME_ROOM = os.getenv("GAME_ROOM", "default")
+DISCORD_BOT_PATH = os.getenv(
+    "DISCORD_BOT_PATH", os.path.join(BASE_DIR, "..", "discord-bot", "main.py")
+)
+
+
+class BotClient(Protocol):
+    """Interface commune pour parler au bot Discord, en HTTP ou in-process."""
+
+    async def get_players(self) -> dict: ...
+
+    async def set_phase(self, phase: str) -> dict: ...
+
+    async def check_player(self, player_id: str) -> dict: ...
+
+    async def start(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class HttpBotClient:
+    """Client vers l'API aiohttp du bot (mode séparé)."""
+
+    def __init__(self, base_url: str, room: str):
+        self.base_url = base_url
+        self.room = room
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        headers = {"X-Bot-Token": BOT_API_TOKEN} if BOT_API_TOKEN else {}
+        self.client = httpx.AsyncClient(base_url=self.base_url, headers=headers, timeout=5.0)
+
+    async def close(self) -> None:
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def get_players(self) -> dict:
+        response = await self.client.get(f"/api/rooms/{self.room}/players")
+        return response.json()
+
+    async def set_phase(self, phase: str) -> dict:
+        response = await self.client.post(f"/api/rooms/{self.room}/phase", json={"phase": phase})
+        return response.json()
+
+    async def check_player(self, player_id: str) -> dict:
+        response = await self.client.get(f"/api/rooms/{self.room}/players/check/{player_id}")
+        return response.json()
+
+
+class LocalBotClient:
+    """Bot discord.py lancé dans la boucle d'événements du backend (mode co-localisé)."""
+
+    def __init__(self, bot_path: str, room: str):
+        self.room = room
+        self.task: Optional[asyncio.Task] = None
+        spec = importlib.util.spec_from_file_location("discord_bot", bot_path)
+        self.module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.module)
+        # Le bot tourne dans ce process : pas d'API aiohttp, quel que soit l'environnement
+        self.module.state["api_started"] = True
+
+    async def start(self) -> None:
+        if not self.module.BOT_TOKEN:
+            raise RuntimeError("BOT_TOKEN manquant dans .env")
+        await self.module.bot.login(self.module.BOT_TOKEN)
+        self.task = asyncio.create_task(self.module.bot.connect())
+        self.task.add_done_callback(self.on_connection_done)
+
+    def on_connection_done(self, task: asyncio.Task) -> None:
+        """Signale un bot arrêté sur erreur (intents refusés, gateway...)."""
+        if not task.cancelled() and task.exception():
+            print(f"❌ Bot Discord arrêté : {task.exception()!r}")
+
+    async def close(self) -> None:
+        await self.module.bot.close()
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def get_players(self) -> dict:
+        return await self.module.get_players(self.room)
+
+    async def set_phase(self, phase: str) -> dict:
+        return await self.module.set_phase(phase, self.room)
+
+    async def check_player(self, player_id: str) -> dict:
+        return await self.module.check_player(player_id, self.room)
+
+
+def create_bot_client() -> BotClient:
+    """Choisit l'implémentation selon BOT_MODE."""
+    if BOT_MODE not in BOT_MODES:
+        raise ValueError(f"BOT_MODE invalide : {BOT_MODE!r} (attendu : {', '.join(BOT_MODES)})")
+    if BOT_MODE == "local":
+        return LocalBotClient(DISCORD_BOT_PATH, GAME_ROOM)
+    return HttpBotClient(DISCORD_BOT_URL, GAME_ROOM)
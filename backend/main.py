@@ -5,21 +5,34 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict
 from contextlib import asynccontextmanager
 import asyncio
-import httpx
+import json
 import random
+import secrets
+import time
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 from auth import create_access_token, verify_token, exchange_code, get_discord_user
+from bot_client import create_bot_client
 
 BASE_DIR = os.path.dirname(__file__)
 ENV_PATH = os.path.join(BASE_DIR, ".env")
 load_dotenv()
 
-DISCORD_BOT_URL = os.getenv("DISCORD_BOT_URL", "http://localhost:8080")
 DISCORD_CLIENT_ID = os.getenv("DISCORD_CLIENT_ID")
 DISCORD_REDIRECT_URI = os.getenv("DISCORD_REDIRECT_URI")
 
+# Fichier de reprise : état des parties transmis au process suivant lors d'un déploiement
+HANDOFF_PATH = os.getenv("HANDOFF_PATH", os.path.join(BASE_DIR, "handoff.json"))
+RECONNECT_MIN_MS = int(os.getenv("RECONNECT_MIN_MS", 1000))
+RECONNECT_MAX_MS = int(os.getenv("RECONNECT_MAX_MS", 10000))
+# Au-delà de cette durée, un fichier de reprise est considéré comme périmé
+HANDOFF_TTL_S = int(os.getenv("HANDOFF_TTL_S", 300))
+# Jeton des endpoints /admin ; sans jeton, ces endpoints sont désactivés
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+bot_client = create_bot_client()
+
 # ========== Lifespan context manager (remplace on_event) ==========
 
 async def check_players_in_voice():
@@ -35,15 +48,10 @@ async def check_players_in_voice():
                 continue
             
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        f"{DISCORD_BOT_URL}/api/players/check/{player.id}",
-                        timeout=5.0
-                    )
-                    data = response.json()
-                    
-                    if not data.get("in_voice"):
-                        print(f"⚠️ {player.display_name} n'est plus dans le vocal")
+                data = await bot_client.check_player(player.id)
+                
+                if not data.get("in_voice"):
+                    print(f"⚠️ {player.display_name} n'est plus dans le vocal")
             
             except Exception as e:
                 print(f"Erreur vérification vocal: {e}")
@@ -53,11 +61,17 @@ async def check_players_in_voice():
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Démarrage du backend...")
-    task = asyncio.create_task(check_players_in_voice())
+    restored = load_handoff()
+    await bot_client.start()
+    tasks = [asyncio.create_task(check_players_in_voice())]
+    if restored:
+        tasks.append(asyncio.create_task(restore_bot_phase()))
     yield
     # Shutdown
     print("🛑 Arrêt du backend...")
-    task.cancel()
+    for task in tasks:
+        task.cancel()
+    await bot_client.close()
 
 
 app = FastAPI(title="Werewolf Game API", lifespan=lifespan)
@@ -96,6 +110,106 @@ class Vote(BaseModel):
 
 game_state = GameState(phase="lobby")
 connected_clients: List[WebSocket] = []
+server_state = {"draining": False}
+# Sérialise les modifications de la partie et la sauvegarde du drain
+state_lock = asyncio.Lock()
+
+# ========== Arrêt propre et reprise d'état ==========
+
+def load_handoff() -> bool:
+    """Recharge l'état laissé par le process précédent, avant d'accepter des connexions."""
+    global game_state
+    
+    if not os.path.exists(HANDOFF_PATH):
+        return False
+    
+    try:
+        with open(HANDOFF_PATH) as f:
+            data = json.load(f)
+        restored = GameState(**data["game_state"])
+        age = time.time() - data["saved_at"]
+    except Exception as e:
+        # Garder le fichier de côté pour pouvoir récupérer la partie à la main
+        os.replace(HANDOFF_PATH, f"{HANDOFF_PATH}.bad")
+        print(f"Erreur reprise d'état: {e} (fichier déplacé vers {HANDOFF_PATH}.bad)")
+        return False
+    
+    if age > HANDOFF_TTL_S:
+        os.replace(HANDOFF_PATH, f"{HANDOFF_PATH}.stale")
+        print(f"⚠️ Fichier de reprise périmé ({int(age)} s), déplacé vers {HANDOFF_PATH}.stale")
+        return False
+    
+    game_state = restored
+    os.remove(HANDOFF_PATH)
+    print(f"♻️ État repris depuis {HANDOFF_PATH} (phase {game_state.phase})")
+    return True
+
+
+def save_handoff():
+    """Écrit l'état du jeu de façon atomique pour le process suivant."""
+    tmp_path = f"{HANDOFF_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"saved_at": time.time(), "game_state": game_state.dict()}, f)
+    os.replace(tmp_path, HANDOFF_PATH)
+
+
+def discord_phase(phase: str) -> str:
+    """Phase du salon vocal correspondant à une phase de jeu."""
+    if phase == "lobby":
+        return "idle"
+    return "night" if phase == "night" else "day"
+
+
+async def restore_bot_phase():
+    """Réapplique au bot la phase d'une partie reprise, le temps qu'il soit prêt."""
+    for _ in range(10):
+        try:
+            result = await bot_client.set_phase(discord_phase(game_state.phase))
+            if "error" not in result:
+                return
+        except Exception as e:
+            print(f"Erreur reprise de phase du bot: {e}")
+        await asyncio.sleep(3)
+    
+    print("⚠️ Phase du bot non rétablie après reprise d'état")
+
+
+def reconnect_hint() -> dict:
+    """Message invitant un client à se reconnecter, avec un délai aléatoire pour étaler la charge."""
+    return {
+        "action": "reconnect",
+        "retry_after_ms": random.randint(RECONNECT_MIN_MS, RECONNECT_MAX_MS),
+    }
+
+
+async def send_reconnect_hint(websocket: WebSocket):
+    """Envoie l'indication de reconnexion puis ferme avec le code 1012 (redémarrage du service)."""
+    try:
+        await websocket.send_json(reconnect_hint())
+        await websocket.close(code=1012)
+    except Exception:
+        pass
+
+
+async def drain() -> int:
+    """Passe en mode drain : plus de nouvelles parties, clients redirigés, état sauvegardé."""
+    # Attend la fin des modifications en cours pour que la sauvegarde soit définitive
+    async with state_lock:
+        server_state["draining"] = True
+        save_handoff()
+    
+    clients = list(connected_clients)
+    connected_clients.clear()
+    await asyncio.gather(*(send_reconnect_hint(client) for client in clients))
+    return len(clients)
+
+
+async def lock_game_state():
+    """Tient le verrou pendant toute la requête ; refuse toute modification une fois drainé."""
+    async with state_lock:
+        if server_state["draining"]:
+            raise HTTPException(status_code=503, detail="Serveur en cours de redémarrage")
+        yield
 
 # ========== Attribution des rôles ==========
 
@@ -126,6 +240,11 @@ def assign_roles(player_count: int) -> List[str]:
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
+    
+    if server_state["draining"]:
+        await send_reconnect_hint(websocket)
+        return
+    
     connected_clients.append(websocket)
     
     try:
@@ -136,7 +255,8 @@ async def websocket_endpoint(websocket: WebSocket):
             await handle_websocket_message(data, websocket)
     
     except WebSocketDisconnect:
-        connected_clients.remove(websocket)
+        if websocket in connected_clients:
+            connected_clients.remove(websocket)
 
 
 async def broadcast_state():
@@ -257,13 +377,11 @@ async def get_game_state():
     return game_state
 
 
-@app.post("/game/start")
+@app.post("/game/start", dependencies=[Depends(lock_game_state)])
 async def start_game():
     """Démarre une nouvelle partie avec attribution automatique des rôles."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{DISCORD_BOT_URL}/api/players")
-            data = response.json()
+        data = await bot_client.get_players()
         
         if not data.get("success"):
             raise HTTPException(status_code=400, detail="Impossible de récupérer les joueurs")
@@ -294,11 +412,7 @@ async def start_game():
         game_state.dead_players = []
         game_state.votes = {}
         
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                f"{DISCORD_BOT_URL}/api/phase",
-                json={"phase": "night"}
-            )
+        await bot_client.set_phase("night")
         
         await broadcast_state()
         
@@ -315,7 +429,7 @@ async def start_game():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/game/phase/{phase}")
+@app.post("/game/phase/{phase}", dependencies=[Depends(lock_game_state)])
 async def change_phase(phase: str):
     """Change la phase du jeu."""
     if phase not in ["night", "day", "voting", "ended"]:
@@ -327,22 +441,17 @@ async def change_phase(phase: str):
         game_state.day_number += 1
         game_state.votes = {}
     
-    discord_phase = "night" if phase == "night" else "day"
-    async with httpx.AsyncClient() as client:
-        try:
-            await client.post(
-                f"{DISCORD_BOT_URL}/api/phase",
-                json={"phase": discord_phase}
-            )
-        except:
-            pass
+    try:
+        await bot_client.set_phase(discord_phase(phase))
+    except:
+        pass
     
     await broadcast_state()
     
     return {"success": True, "phase": phase}
 
 
-@app.post("/game/vote")
+@app.post("/game/vote", dependencies=[Depends(lock_game_state)])
 async def submit_vote(vote: Vote):
     """Enregistre un vote."""
     voter = next((p for p in game_state.players if p.id == vote.voter_id), None)
@@ -366,7 +475,7 @@ async def get_players():
     return {"players": game_state.players}
 
 
-@app.post("/game/kill/{player_id}")
+@app.post("/game/kill/{player_id}", dependencies=[Depends(lock_game_state)])
 async def kill_player(player_id: str):
     """Tue un joueur."""
     player = next((p for p in game_state.players if p.id == player_id), None)
@@ -384,7 +493,7 @@ async def kill_player(player_id: str):
     return {"success": True, "message": f"{player.display_name} a été éliminé"}
 
 
-@app.post("/game/reset")
+@app.post("/game/reset", dependencies=[Depends(lock_game_state)])
 async def reset_game():
     """Réinitialise complètement la partie."""
     game_state.phase = "lobby"
@@ -393,14 +502,10 @@ async def reset_game():
     game_state.dead_players = []
     game_state.votes = {}
     
-    async with httpx.AsyncClient() as client:
-        try:
-            await client.post(
-                f"{DISCORD_BOT_URL}/api/phase",
-                json={"phase": "idle"}
-            )
-        except:
-            pass
+    try:
+        await bot_client.set_phase("idle")
+    except:
+        pass
     
     await broadcast_state()
     
@@ -428,6 +533,35 @@ async def get_game_stats():
     }
 
 
+# ========== Déploiement ==========
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Protège les endpoints /admin par ADMIN_TOKEN ; sans jeton configuré, ils sont désactivés."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Endpoints admin désactivés (ADMIN_TOKEN absent)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Jeton admin invalide")
+
+
+@app.post("/admin/drain", dependencies=[Depends(require_admin)])
+async def start_drain():
+    """À appeler avant d'arrêter le process : sauvegarde l'état et redirige les clients."""
+    clients = await drain()
+    return {"success": True, "clients_notified": clients, "handoff_path": HANDOFF_PATH}
+
+
+@app.delete("/admin/drain", dependencies=[Depends(require_admin)])
+async def stop_drain():
+    """Annule le drain (déploiement abandonné) : la partie reprend dans ce process."""
+    async with state_lock:
+        server_state["draining"] = False
+        
+        if os.path.exists(HANDOFF_PATH):
+            os.remove(HANDOFF_PATH)
+    
+    return {"success": True, "message": "Drain annulé"}
+
+
 # ========== Démarrage ==========
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+# backend/tests/test_handoff.py
+import asyncio
+import json
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def handoff_path(tmp_path, monkeypatch):
+    path = tmp_path / "handoff.json"
+    monkeypatch.setattr(main, "HANDOFF_PATH", str(path))
+    monkeypatch.setattr(main, "game_state", main.GameState(phase="lobby"))
+    monkeypatch.setattr(main, "server_state", {"draining": False})
+    monkeypatch.setattr(main, "state_lock", asyncio.Lock())
+    return path
+
+
+def night_state() -> main.GameState:
+    return main.GameState(
+        phase="night",
+        day_number=2,
+        players=[main.Player(id="1", username="a", display_name="A", avatar_url="", role="Voyante")],
+        votes={"1": "1"},
+    )
+
+
+def test_save_and_load_round_trip(handoff_path, monkeypatch):
+    monkeypatch.setattr(main, "game_state", night_state())
+    main.save_handoff()
+
+    monkeypatch.setattr(main, "game_state", main.GameState(phase="lobby"))
+    assert main.load_handoff() is True
+
+    assert main.game_state == night_state()
+    assert not handoff_path.exists()
+
+
+def test_load_without_file(handoff_path):
+    assert main.load_handoff() is False
+    assert main.game_state.phase == "lobby"
+
+
+def test_unreadable_handoff_is_moved_aside(handoff_path):
+    handoff_path.write_text(json.dumps({"saved_at": time.time(), "game_state": {"day_number": 1}}))
+
+    assert main.load_handoff() is False
+
+    assert main.game_state.phase == "lobby"
+    assert not handoff_path.exists()
+    assert (handoff_path.parent / "handoff.json.bad").exists()
+
+
+def test_stale_handoff_is_ignored(handoff_path):
+    saved_at = time.time() - main.HANDOFF_TTL_S - 1
+    handoff_path.write_text(json.dumps({"saved_at": saved_at, "game_state": night_state().dict()}))
+
+    assert main.load_handoff() is False
+
+    assert main.game_state.phase == "lobby"
+    assert (handoff_path.parent / "handoff.json.stale").exists()
+
+
+def test_drain_waits_for_in_flight_mutation(handoff_path):
+    async def scenario():
+        await main.state_lock.acquire()
+        drain = asyncio.create_task(main.drain())
+        await asyncio.sleep(0.01)
+
+        assert not drain.done()
+        assert not handoff_path.exists()
+
+        main.game_state.phase = "night"
+        main.state_lock.release()
+        await drain
+
+        saved = json.loads(handoff_path.read_text())
+        assert saved["game_state"]["phase"] == "night"
+
+    asyncio.run(scenario())
+
+
+def test_mutations_rejected_while_draining():
+    main.server_state["draining"] = True
+    client = TestClient(main.app)
+
+    assert client.post("/game/start").status_code == 503
+    assert client.post("/game/phase/day").status_code == 503
+    assert client.post("/game/kill/1").status_code == 503
+    assert client.post("/game/reset").status_code == 503
+    assert client.post("/game/vote", json={"voter_id": "1", "target_id": "2"}).status_code == 503
+
+
+def test_admin_routes_disabled_without_token(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    client = TestClient(main.app)
+
+    assert client.post("/admin/drain").status_code == 403
+    assert main.server_state["draining"] is False
+
+
+def test_admin_drain_and_resume(handoff_path, monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    client = TestClient(main.app)
+
+    assert client.post("/admin/drain", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert client.post("/admin/drain", headers={"X-Admin-Token": "secret"}).status_code == 200
+    assert main.server_state["draining"] is True
+    assert handoff_path.exists()
+
+    assert client.delete("/admin/drain", headers={"X-Admin-Token": "secret"}).status_code == 200
+    assert main.server_state["draining"] is False
+    assert not handoff_path.exists()
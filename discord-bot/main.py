@@ -5,88 +5,273 @@ import os
 from dotenv import load_dotenv
 from aiohttp import web
 import asyncio
+import secrets
+from typing import Dict, Optional
 
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 VOICE_CHANNEL_ID = int(os.getenv("VOICE_CHANNEL_ID", 0))
+# Salons supplémentaires au format "salle:channel_id,salle2:channel_id2"
+VOICE_CHANNELS = os.getenv("VOICE_CHANNELS", "")
+DEFAULT_ROOM = "default"
 API_PORT = int(os.getenv("API_PORT", 8080))
+# Secret partagé avec le backend ; sans lui, la gestion des salles par l'API est désactivée
+BOT_API_TOKEN = os.getenv("BOT_API_TOKEN")
 
 intents = discord.Intents.default()
 intents.guilds = True
 intents.voice_states = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+class WerewolfBot(commands.Bot):
+    async def close(self):
+        """Arrête les files de mute de toutes les salles avant de fermer le bot."""
+        for room in list(rooms):
+            unregister_room(room)
+        await super().close()
+
+
+bot = WerewolfBot(command_prefix="!", intents=intents)
 
 state = {
-    "voice_channel": None,
     "voice_client": None,
-    "phase": "idle",  
+    # Mis à True par le backend en mode co-localisé pour ne pas lancer l'API HTTP
+    "api_started": False,
 }
 
+# Registre des salles de jeu : salle -> {"voice_channel", "phase", "mute_queue", "mute_worker"}
+rooms: Dict[str, dict] = {}
+
+
+def parse_voice_channels() -> Dict[str, int]:
+    """Lit la configuration des salons vocaux depuis l'environnement."""
+    channels = {}
+    if VOICE_CHANNEL_ID:
+        channels[DEFAULT_ROOM] = VOICE_CHANNEL_ID
+    
+    for entry in VOICE_CHANNELS.split(","):
+        if not entry.strip():
+            continue
+        room, _, channel_id = entry.strip().partition(":")
+        try:
+            channels[room] = int(channel_id)
+        except ValueError:
+            print(f"⚠️ Entrée VOICE_CHANNELS invalide : {entry}")
+    
+    return channels
+
 
 @bot.event
 async def on_ready():
     print(f"✅ Bot Discord connecté : {bot.user}")
     
-    if VOICE_CHANNEL_ID:
-        channel = bot.get_channel(VOICE_CHANNEL_ID)
-        if channel:
-            state["voice_channel"] = channel
-            print(f"✅ Channel vocal configuré : {channel.name}")
+    for room, channel_id in parse_voice_channels().items():
+        result = register_room(room, channel_id)
+        if "error" in result:
+            print(f"⚠️ Channel vocal {channel_id} introuvable ({room})")
         else:
-            print(f"⚠️ Channel vocal {VOICE_CHANNEL_ID} introuvable")
+            print(f"✅ Channel vocal configuré : {result['channel_name']} ({room})")
 
 
-# ========== API REST pour le backend ==========
+# ========== Registre des salles ==========
 
-async def check_player_in_voice(request: web.Request):
-    """Vérifie si un joueur est toujours dans le vocal."""
-    player_id = request.match_info["player_id"]
-    channel = state["voice_channel"]
-    if not channel:
-        return web.json_response({"in_voice": False})
+def register_room(room: str, channel_id: int) -> dict:
+    """Associe une salle de jeu à un salon vocal, sur n'importe quelle guilde."""
+    channel = bot.get_channel(channel_id)
+    if not isinstance(channel, discord.VoiceChannel):
+        return {"error": "Voice channel not found"}
+    
+    if room in rooms:
+        rooms[room]["voice_channel"] = channel
+    else:
+        queue: asyncio.Queue = asyncio.Queue()
+        rooms[room] = {
+            "voice_channel": channel,
+            "phase": "idle",
+            "mute_queue": queue,
+            "mute_worker": asyncio.create_task(mute_worker(room, queue)),
+        }
+    
+    return {
+        "success": True,
+        "room": room,
+        "guild_name": channel.guild.name,
+        "channel_name": channel.name,
+    }
+
+
+def unregister_room(room: str) -> dict:
+    """Retire une salle du registre et arrête sa file de mute."""
+    entry = rooms.pop(room, None)
+    if not entry:
+        return {"error": "Unknown room"}
+    
+    entry["mute_worker"].cancel()
+
+    queue = entry["mute_queue"]
+    while not queue.empty():
+        _, future = queue.get_nowait()
+        if not future.done():
+            future.set_result({"error": "Room unregistered"})
+
+    return {"success": True, "room": room}
+
+
+def list_rooms() -> dict:
+    """Retourne les salles enregistrées."""
+    return {
+        "success": True,
+        "rooms": [
+            {
+                "room": room,
+                "guild_name": entry["voice_channel"].guild.name,
+                "channel_name": entry["voice_channel"].name,
+                "phase": entry["phase"],
+            }
+            for room, entry in rooms.items()
+        ]
+    }
+
+
+async def mute_worker(room: str, queue: asyncio.Queue):
+    """Applique les changements de phase d'un salon un par un, dans l'ordre reçu."""
+    while True:
+        phase, future = await queue.get()
+        entry = rooms.get(room)
+        
+        try:
+            should_mute = (phase == "night")
+            muted_count = 0
+            
+            for member in entry["voice_channel"].members:
+                if not member.bot:
+                    try:
+                        await member.edit(mute=should_mute)
+                        muted_count += 1
+                    except Exception as e:
+                        print(f"Erreur mute {member}: {e}")
+            
+            entry["phase"] = phase
+            
+            if not future.done():
+                future.set_result({
+                    "success": True,
+                    "room": room,
+                    "phase": phase,
+                    "players_affected": muted_count
+                })
+        
+        except asyncio.CancelledError:
+            # Salle retirée ou bot arrêté en plein mute : ne pas laisser set_phase en attente
+            if not future.done():
+                future.set_result({"error": "Room unregistered"})
+            raise
+        
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        
+        finally:
+            queue.task_done()
+
+
+# ========== Interface du bot (partagée HTTP / in-process) ==========
+
+async def check_player(player_id: str, room: str = DEFAULT_ROOM) -> dict:
+    """Vérifie si un joueur est toujours dans le vocal de la salle."""
+    entry = rooms.get(room)
+    if not entry:
+        return {"in_voice": False}
     
+    channel = entry["voice_channel"]
     player_in_voice = any(str(m.id) == player_id for m in channel.members if not m.bot)
     
+    return {
+        "in_voice": player_in_voice,
+        "channel_name": channel.name if player_in_voice else None,
+    }
+
+
+async def set_phase(phase: str, room: str = DEFAULT_ROOM) -> dict:
+    """Change la phase d'une salle et met le mute/unmute dans sa file."""
+    if phase not in ["idle", "night", "day"]:
+        return {"error": "Invalid phase"}
+    
+    entry = rooms.get(room)
+    if not entry:
+        return {"error": "No voice channel configured"}
+    
+    future = asyncio.get_running_loop().create_future()
+    await entry["mute_queue"].put((phase, future))
+    return await future
+
+
+async def get_players(room: str = DEFAULT_ROOM) -> dict:
+    """Retourne la liste des joueurs dans le vocal de la salle."""
+    entry = rooms.get(room)
+    if not entry:
+        return {"error": "No voice channel"}
+    
+    players = []
+    for member in entry["voice_channel"].members:
+        if not member.bot:
+            players.append({
+                "id": str(member.id),
+                "username": member.name,
+                "display_name": member.display_name,
+                "avatar_url": str(member.display_avatar.url),
+                "is_muted": member.voice.mute if member.voice else False,
+                "is_deafened": member.voice.deaf if member.voice else False,
+            })
+    
+    return {
+        "success": True,
+        "players": players,
+        "current_phase": entry["phase"]
+    }
+
+
+# ========== API REST pour le backend ==========
+
+def json_result(result: dict):
+    """Convertit le résultat de l'interface en réponse HTTP."""
+    return web.json_response(result, status=400 if "error" in result else 200)
+
+
+def check_bot_token(request: web.Request, required: bool) -> Optional[web.Response]:
+    """Vérifie l'en-tête X-Bot-Token ; renvoie une réponse d'erreur si l'accès est refusé."""
+    if not BOT_API_TOKEN:
+        if required:
+            return web.json_response({"error": "BOT_API_TOKEN not configured"}, status=403)
+        return None
+    
+    token = request.headers.get("X-Bot-Token", "")
+    if not secrets.compare_digest(token, BOT_API_TOKEN):
+        return web.json_response({"error": "Invalid bot token"}, status=401)
+    return None
+
+
+def request_room(request: web.Request) -> str:
+    """Salle ciblée par la route, la salle par défaut pour les anciennes routes."""
+    return request.match_info.get("room", DEFAULT_ROOM)
+
+
+async def check_player_in_voice(request: web.Request):
+    """Vérifie si un joueur est toujours dans le vocal."""
     return web.json_response(
-        {
-            "in_voice": player_in_voice,
-            "channel_name": channel.name if player_in_voice else None,
-        }
+        await check_player(request.match_info["player_id"], request_room(request))
     )
     
 async def handle_phase_change(request):
     """Change la phase et gère le mute/unmute."""
+    denied = check_bot_token(request, required=False)
+    if denied:
+        return denied
+    
     try:
         data = await request.json()
-        phase = data.get("phase")
-        
-        if phase not in ["idle", "night", "day"]:
-            return web.json_response({"error": "Invalid phase"}, status=400)
-        
-        channel = state["voice_channel"]
-        if not channel:
-            return web.json_response({"error": "No voice channel configured"}, status=400)
-        
-        should_mute = (phase == "night")
-        muted_count = 0
-        
-        for member in channel.members:
-            if not member.bot:
-                try:
-                    await member.edit(mute=should_mute)
-                    muted_count += 1
-                except Exception as e:
-                    print(f"Erreur mute {member}: {e}")
-        
-        state["phase"] = phase
-        
-        return web.json_response({
-            "success": True,
-            "phase": phase,
-            "players_affected": muted_count
-        })
+        return json_result(await set_phase(data.get("phase"), request_room(request)))
     
     except Exception as e:
         return web.json_response({"error": str(e)}, status=500)
@@ -95,32 +280,41 @@ async def handle_phase_change(request):
 async def handle_get_players(request):
     """Retourne la liste des joueurs dans le vocal."""
     try:
-        channel = state["voice_channel"]
-        if not channel:
-            return web.json_response({"error": "No voice channel"}, status=400)
-        
-        players = []
-        for member in channel.members:
-            if not member.bot:
-                players.append({
-                    "id": str(member.id),
-                    "username": member.name,
-                    "display_name": member.display_name,
-                    "avatar_url": str(member.display_avatar.url),
-                    "is_muted": member.voice.mute if member.voice else False,
-                    "is_deafened": member.voice.deaf if member.voice else False,
-                })
-        
-        return web.json_response({
-            "success": True,
-            "players": players,
-            "current_phase": state["phase"]
-        })
+        return json_result(await get_players(request_room(request)))
+    
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def handle_list_rooms(request):
+    """Retourne les salles enregistrées."""
+    return web.json_response(list_rooms())
+
+
+async def handle_register_room(request):
+    """Associe une salle à un salon vocal."""
+    denied = check_bot_token(request, required=True)
+    if denied:
+        return denied
+    
+    try:
+        data = await request.json()
+        return json_result(register_room(request_room(request), int(data.get("channel_id", 0))))
     
     except Exception as e:
         return web.json_response({"error": str(e)}, status=500)
 
 
+async def handle_unregister_room(request):
+    """Retire une salle du registre."""
+    denied = check_bot_token(request, required=True)
+    if denied:
+        return denied
+    
+    result = unregister_room(request_room(request))
+    return web.json_response(result, status=404 if "error" in result else 200)
+
+
 async def handle_play_sound(request):
     """Joue un son dans le canal vocal."""
     try:
@@ -145,8 +339,9 @@ async def handle_health_check(request):
     return web.json_response({
         "status": "ok",
         "bot_name": str(bot.user),
-        "phase": state["phase"],
-        "voice_channel_configured": state["voice_channel"] is not None
+        "phase": rooms[DEFAULT_ROOM]["phase"] if DEFAULT_ROOM in rooms else "idle",
+        "rooms": len(rooms),
+        "voice_channel_configured": DEFAULT_ROOM in rooms
     })
 
 
@@ -156,9 +351,17 @@ async def start_api_server():
     
     app.router.add_post('/api/phase', handle_phase_change)
     app.router.add_get('/api/players', handle_get_players)
+    app.router.add_get('/api/players/check/{player_id}', check_player_in_voice)
     app.router.add_post('/api/sound', handle_play_sound)
     app.router.add_get('/api/health', handle_health_check)
     
+    app.router.add_get('/api/rooms', handle_list_rooms)
+    app.router.add_post('/api/rooms/{room}', handle_register_room)
+    app.router.add_delete('/api/rooms/{room}', handle_unregister_room)
+    app.router.add_post('/api/rooms/{room}/phase', handle_phase_change)
+    app.router.add_get('/api/rooms/{room}/players', handle_get_players)
+    app.router.add_get('/api/rooms/{room}/players/check/{player_id}', check_player_in_voice)
+    
     async def cors_middleware(app, handler):
         async def middleware_handler(request):
             if request.method == "OPTIONS":
@@ -183,8 +386,10 @@ async def start_api_server():
 
 @bot.event
 async def on_connect():
-    """Démarre l'API au démarrage du bot."""
-    bot.loop.create_task(start_api_server())
+    """Démarre l'API au démarrage du bot (mode séparé uniquement)."""
+    if not state["api_started"]:
+        state["api_started"] = True
+        bot.loop.create_task(start_api_server())
 
 
 # ========== Démarrage ==========
@@ -0,0 +1,104 @@
+# discord-bot/tests/test_rooms.py
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("discord")
+
+BOT_PATH = os.path.join(os.path.dirname(__file__), "..", "main.py")
+
+
+@pytest.fixture
+def bot_module():
+    spec = importlib.util.spec_from_file_location("discord_bot", BOT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeMember:
+    def __init__(self, member_id: int, blocked: asyncio.Event = None):
+        self.id = member_id
+        self.bot = False
+        self.blocked = blocked
+        self.editing = asyncio.Event()
+        self.mute = None
+
+    async def edit(self, mute: bool):
+        self.editing.set()
+        if self.blocked:
+            await self.blocked.wait()
+        self.mute = mute
+
+
+class FakeChannel:
+    def __init__(self, members):
+        self.name = "Village"
+        self.members = members
+
+
+def add_room(module, room: str, channel: FakeChannel):
+    """Enregistre une salle sans passer par bot.get_channel."""
+    queue = asyncio.Queue()
+    module.rooms[room] = {
+        "voice_channel": channel,
+        "phase": "idle",
+        "mute_queue": queue,
+        "mute_worker": asyncio.create_task(module.mute_worker(room, queue)),
+    }
+
+
+def test_set_phase_mutes_members(bot_module):
+    async def scenario():
+        member = FakeMember(1)
+        add_room(bot_module, "salle", FakeChannel([member]))
+
+        result = await bot_module.set_phase("night", "salle")
+
+        assert result["success"] is True
+        assert result["players_affected"] == 1
+        assert member.mute is True
+        assert bot_module.rooms["salle"]["phase"] == "night"
+        bot_module.unregister_room("salle")
+
+    asyncio.run(scenario())
+
+
+def test_unregister_during_mute_resolves_in_flight_job(bot_module):
+    async def scenario():
+        member = FakeMember(1, blocked=asyncio.Event())
+        add_room(bot_module, "salle", FakeChannel([member]))
+
+        job = asyncio.create_task(bot_module.set_phase("night", "salle"))
+        await member.editing.wait()
+        bot_module.unregister_room("salle")
+
+        result = await asyncio.wait_for(job, timeout=1)
+        assert result == {"error": "Room unregistered"}
+
+    asyncio.run(scenario())
+
+
+def test_unregister_clears_queued_jobs(bot_module):
+    async def scenario():
+        member = FakeMember(1, blocked=asyncio.Event())
+        add_room(bot_module, "salle", FakeChannel([member]))
+
+        first = asyncio.create_task(bot_module.set_phase("night", "salle"))
+        await member.editing.wait()
+        second = asyncio.create_task(bot_module.set_phase("day", "salle"))
+        await asyncio.sleep(0)
+
+        assert bot_module.unregister_room("salle") == {"success": True, "room": "salle"}
+        results = await asyncio.wait_for(asyncio.gather(first, second), timeout=1)
+
+        assert results == [{"error": "Room unregistered"}] * 2
+        assert "salle" not in bot_module.rooms
+
+    asyncio.run(scenario())
+
+
+def test_unregister_unknown_room(bot_module):
+    assert bot_module.unregister_room("absente") == {"error": "Unknown room"}
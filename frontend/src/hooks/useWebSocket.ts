@@ -1,43 +1,76 @@
 // src/hooks/useWebSocket.ts
-import { useEffect, useState, useCallback } from 'react';
+import { useEffect, useState, useCallback, useRef } from 'react';
 import { GameState } from '@/lib/api';
 
 const WS_URL = process.env.NEXT_PUBLIC_WS_URL || 'ws://localhost:8000';
+const RECONNECT_BASE_MS = 1000;
+const RECONNECT_MAX_MS = 30000;
+
+// Backoff exponentiel avec jitter complet pour éviter que tous les clients reviennent ensemble
+function backoffDelay(attempt: number) {
+  const cap = Math.min(RECONNECT_MAX_MS, RECONNECT_BASE_MS * 2 ** attempt);
+  return Math.random() * cap;
+}
 
 export function useWebSocket() {
   const [gameState, setGameState] = useState<GameState | null>(null);
   const [isConnected, setIsConnected] = useState(false);
   const [ws, setWs] = useState<WebSocket | null>(null);
+  const retryAfter = useRef<number | null>(null);
+  const attempts = useRef(0);
 
   useEffect(() => {
-    const websocket = new WebSocket(`${WS_URL}/ws`);
+    let websocket: WebSocket;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
 
-    websocket.onopen = () => {
-      console.log('✅ WebSocket connecté');
-      setIsConnected(true);
-    };
+    const connect = () => {
+      websocket = new WebSocket(`${WS_URL}/ws`);
 
-    websocket.onmessage = (event) => {
-      try {
-        const data = JSON.parse(event.data);
-        setGameState(data);
-      } catch (error) {
-        console.error('Erreur parsing WebSocket:', error);
-      }
-    };
+      websocket.onopen = () => {
+        console.log('✅ WebSocket connecté');
+        attempts.current = 0;
+        setIsConnected(true);
+      };
 
-    websocket.onerror = (error) => {
-      console.error('❌ WebSocket erreur:', error);
-    };
+      websocket.onmessage = (event) => {
+        try {
+          const data = JSON.parse(event.data);
+          if (data.action === 'reconnect') {
+            // Le serveur redémarre : il indique quand revenir
+            retryAfter.current = data.retry_after_ms;
+            return;
+          }
+          if (data.action) return;
+          setGameState(data);
+        } catch (error) {
+          console.error('Erreur parsing WebSocket:', error);
+        }
+      };
+
+      websocket.onerror = (error) => {
+        console.error('❌ WebSocket erreur:', error);
+      };
+
+      websocket.onclose = () => {
+        console.log('🔌 WebSocket déconnecté');
+        setIsConnected(false);
+        if (closed) return;
+
+        const delay = retryAfter.current ?? backoffDelay(attempts.current);
+        retryAfter.current = null;
+        attempts.current += 1;
+        reconnectTimer = setTimeout(connect, delay);
+      };
 
-    websocket.onclose = () => {
-      console.log('🔌 WebSocket déconnecté');
-      setIsConnected(false);
+      setWs(websocket);
     };
 
-    setWs(websocket);
+    connect();
 
     return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
       websocket.close();
     };
   }, []);